@@ -28,6 +28,7 @@ from constants import (
     ROBLOX_PLACE_TO_UNIVERSE_ENDPOINT,
     Tables,
 )
+from json_utils import loads as json_loads
 from schema import SchemaManager
 
 # Windows console encoding fix
@@ -62,7 +63,7 @@ async def get_universe_from_place(place_id: int) -> dict | None:
         try:
             async with session.get(url, timeout=10) as resp:
                 if resp.status == 200:
-                    data = await resp.json()
+                    data = await resp.json(loads=json_loads)
                     universe_id = data.get("universeId")
                     if universe_id:
                         # Now get the game details
@@ -81,7 +82,7 @@ async def get_game_info(universe_id: int, retries: int = 3) -> dict | None:
             try:
                 async with session.get(url, timeout=10) as resp:
                     if resp.status == 200:
-                        data = await resp.json()
+                        data = await resp.json(loads=json_loads)
                         games = data.get("data", [])
                         if games:
                             game = games[0]
@@ -9,8 +9,11 @@ DEFAULT_LIMIT = 200
 
 async def run(limit: int = DEFAULT_LIMIT) -> None:
     client = RoProxyClient()
-    universe_ids = await client.get_top_universe_ids(limit=limit)
-    await client.poll_top_games(universe_ids)
+    try:
+        universe_ids = await client.get_top_universe_ids(limit=limit)
+        await client.poll_top_games(universe_ids)
+    finally:
+        await client.aclose()
 
 
 if __name__ == "__main__":
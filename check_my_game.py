@@ -18,6 +18,8 @@ from dotenv import load_dotenv
 import duckdb
 import json
 
+from json_utils import loads as json_loads
+
 load_dotenv()
 
 DB_PATH = Path(os.getenv("DB_PATH", str(Path(__file__).parent / "early_shift.db")))
@@ -47,7 +49,7 @@ async def search_youtube_for_game(game_name: str, max_results: int = 10) -> list
         async with session.get(url, params=params) as resp:
             if resp.status != 200:
                 return []
-            data = await resp.json()
+            data = await resp.json(loads=json_loads)
     
     videos = []
     for item in data.get("items", []):
@@ -13,6 +13,8 @@ DEFAULT_DB_PATH = str(PROJECT_ROOT / "early_shift.db")
 # Table Names
 class Tables:
     GAMES = "games"
+    GAMES_LATEST = "games_latest"
+    GAMES_WEEK_AGO = "games_7d_ago"
     GAME_METADATA = "game_metadata"
     STUDIOS = "studios"
     YOUTUBE_VIDEOS = "youtube_videos"
@@ -39,22 +41,14 @@ DEFAULT_ROPROXY_BATCH_DELAY_SECONDS = 2.5
 DEFAULT_ROPROXY_BACKOFF_BASE_SECONDS = 5.0
 DEFAULT_ROPROXY_BACKOFF_MAX_SECONDS = 30.0
 DEFAULT_ROPROXY_MAX_RETRIES = 5
-
-# YouTube
-KEYWORD_HINTS = [
-    "new",
-    "update",
-    "secret",
-    "mechanic",
-    "code",
-    "feature",
-    "quest",
-    "event",
-]
+ROPROXY_UNIVERSE_BATCH_SIZE = 50  # universeIds per /v1/games request
+NTFY_MAX_CONCURRENCY = 20
+NOTION_MAX_CONCURRENCY = 3  # Notion allows ~3 requests/second per integration
 
 # YouTube polling
 DEFAULT_YOUTUBE_CHANNEL_COOLDOWN_HOURS = 12
 UPCOMING_CHANNEL_VIDEO_THRESHOLD = 5
+YOUTUBE_MAX_CONCURRENCY = 10  # channels collected at once
 
 # External signals
 DEFAULT_EXTERNAL_SIGNALS_INTERVAL_HOURS = 6
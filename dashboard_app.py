@@ -9,7 +9,7 @@ import streamlit as st
 from constants import DEFAULT_DB_PATH
 from db_manager import get_db_connection
 from mechanic_detector import MechanicSpike, detect_mechanic_spikes, get_historical_spikes
-from queries import TRENDING_GAMES_QUERY
+from queries import top_movers
 
 def _utc_string(dt: datetime | None) -> str:
     if dt is None:
@@ -20,12 +20,9 @@ def _utc_string(dt: datetime | None) -> str:
 
 
 def _query_dataframe(query: str, params: tuple = ()) -> pd.DataFrame:
-    """Execute query via DuckDB and return a pandas DataFrame (pure Python conversion)."""
+    """Execute query via DuckDB and return a pandas DataFrame (native DuckDB conversion)."""
     with get_db_connection(DEFAULT_DB_PATH, read_only=True) as db:
-        result = db.execute(query, params)
-        columns = [col[0] for col in result.description]
-        rows = result.fetchall()
-    return pd.DataFrame(rows, columns=columns)
+        return db.execute(query, params).df()
 
 st.set_page_config(
     page_title="Early Shift Dashboard",
@@ -34,16 +31,14 @@ st.set_page_config(
 )
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32)
 def load_top_movers(growth_threshold: float, limit: int) -> pd.DataFrame:
     """Load top movers using shared query logic."""
-    query = TRENDING_GAMES_QUERY
-    query += " AND ((cur.ccu - prev.ccu) * 1.0) / NULLIF(prev.ccu, 0) >= ?"
-    query += " ORDER BY growth_percent DESC LIMIT ?"
-    return _query_dataframe(query, (growth_threshold, limit))
+    with get_db_connection(DEFAULT_DB_PATH, read_only=True) as db:
+        return top_movers(db, growth_threshold, limit)
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32)
 def load_recent_videos(hours: int) -> pd.DataFrame:
     query = """
         SELECT channel_title,
@@ -58,7 +53,7 @@ def load_recent_videos(hours: int) -> pd.DataFrame:
     return _query_dataframe(query, (hours,))
 
 
-@st.cache_data(ttl=180)
+@st.cache_data(ttl=180, max_entries=16)
 def detect_spikes_cached(
     lookback_hours: int, growth_threshold: float
 ) -> pd.DataFrame:
@@ -85,7 +80,7 @@ def detect_spikes_cached(
     return pd.DataFrame(rows)
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
 def load_historical_spikes(limit: int) -> pd.DataFrame:
     """Load historical spikes from database."""
     spikes = get_historical_spikes(db_path=DEFAULT_DB_PATH, limit=limit)
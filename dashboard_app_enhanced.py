@@ -12,7 +12,7 @@ import plotly.graph_objects as go
 from constants import DEFAULT_DB_PATH
 from db_manager import get_db_connection
 from mechanic_detector import MechanicSpike, detect_mechanic_spikes, get_historical_spikes
-from queries import TRENDING_GAMES_QUERY
+from queries import top_movers
 from check_my_game import search_youtube_for_game, get_game_ccu_status
 import asyncio
 
@@ -323,13 +323,11 @@ def load_decay_curve(universe_id: int, window_days: int = 7) -> pd.DataFrame:
     return _query_dataframe(query, (universe_id, window_days))
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32)
 def load_top_movers(growth_threshold: float, limit: int) -> pd.DataFrame:
     """Load top movers with additional metrics."""
-    query = TRENDING_GAMES_QUERY
-    query += " AND ((cur.ccu - prev.ccu) * 1.0) / NULLIF(prev.ccu, 0) >= ?"
-    query += " ORDER BY growth_percent DESC LIMIT ?"
-    df = _query_dataframe(query, (growth_threshold, limit))
+    with get_db_connection(DB_PATH, read_only=True) as db:
+        df = top_movers(db, growth_threshold, limit)
     
     # Convert timestamp column to string to avoid React serialization issues
     if 'current_timestamp' in df.columns:
@@ -532,7 +530,7 @@ def load_player_flow() -> tuple[pd.DataFrame, pd.DataFrame, dict]:
     return gainers_df, losers_df, stats
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32)
 def load_recent_videos(hours: int) -> pd.DataFrame:
     """Load recent YouTube videos."""
     query = """
@@ -554,7 +552,7 @@ def load_recent_videos(hours: int) -> pd.DataFrame:
     return df
 
 
-@st.cache_data(ttl=180)
+@st.cache_data(ttl=180, max_entries=16)
 def detect_spikes_cached(
     lookback_hours: int, growth_threshold: float
 ) -> pd.DataFrame:
@@ -640,7 +638,7 @@ def detect_spikes_cached(
     return pd.DataFrame(rows)
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
 def load_historical_spikes(limit: int) -> pd.DataFrame:
     """Load historical spikes from database."""
     spikes = get_historical_spikes(db_path=DB_PATH, limit=limit)
@@ -0,0 +1,41 @@
+"""
+json_utils.py - JSON encode/decode, using orjson when it is installed
+"""
+
+import asyncio
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bodies larger than this are parsed in a worker thread by aloads; smaller
+# ones parse faster inline than the thread hand-off costs
+OFFLOAD_THRESHOLD_BYTES = 16 * 1024
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Parse a JSON document.
+
+    Raises json.JSONDecodeError on invalid input (orjson's error subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+async def aloads(data: bytes | str) -> Any:
+    """Parse a JSON document, off the event loop when it is large."""
+    if len(data) > OFFLOAD_THRESHOLD_BYTES:
+        return await asyncio.to_thread(loads, data)
+    return loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
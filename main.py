@@ -9,10 +9,10 @@ from typing import Dict, List
 
 import aiohttp
 
-from constants import DEFAULT_DB_PATH, MONITORING_INTERVAL_HOURS, NTFY_URL, Tables
+from constants import DEFAULT_DB_PATH, MONITORING_INTERVAL_HOURS, NTFY_MAX_CONCURRENCY, NTFY_URL, Tables
 from db_manager import DatabaseManager
 from notion_writer import NotionWriter
-from queries import TrendingGame, get_trending_games
+from queries import SUBSCRIBED_STUDIOS_QUERY, get_trending_game_records
 from roproxy_client import RoProxyClient
 from schema import SchemaManager
 
@@ -27,36 +27,28 @@ class EarlyShift:
         self.client = RoProxyClient(db_path)
         self.writer = NotionWriter()
         self.db_manager = DatabaseManager(db_path)
+        self._http: aiohttp.ClientSession | None = None
         self._ensure_schema()
 
+    async def _get_http(self) -> aiohttp.ClientSession:
+        """Lazily create the HTTP session shared by every monitoring cycle."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+            )
+        return self._http
+
     def _ensure_schema(self) -> None:
         """Ensure all required database tables exist."""
         SchemaManager.ensure_all_tables(self.db_manager.db)
 
     def get_trending_games(self) -> List[Dict[str, object]]:
         """Get trending games using shared query logic."""
-        trending = get_trending_games(self.db_manager.db, growth_threshold=0.0)
-        return [self._trending_game_to_dict(game) for game in trending]
-
-    @staticmethod
-    def _trending_game_to_dict(game: TrendingGame) -> Dict[str, object]:
-        """Convert TrendingGame to dictionary for backward compatibility."""
-        return {
-            "universe_id": game.universe_id,
-            "game_name": game.game_name,
-            "current_ccu": game.current_ccu,
-            "week_ago_ccu": game.week_ago_ccu,
-            "growth_percent": game.growth_percent,
-            "growth_rate": game.growth_rate,
-            "peak_ccu": game.peak_ccu,
-            "timestamp": game.timestamp,
-        }
+        return get_trending_game_records(self.db_manager.db, growth_threshold=0.0)
 
     def get_subscribed_studios(self) -> List[Dict[str, object]]:
         """Get list of subscribed studios."""
-        rows = self.db_manager.db.execute(
-            f"SELECT studio_id, name, notion_token, notion_database_id, ntfy_topic FROM {Tables.STUDIOS}"
-        ).fetchall()
+        rows = self.db_manager.db.execute(SUBSCRIBED_STUDIOS_QUERY).fetchall()
         return [
             {
                 "studio_id": row[0],
@@ -68,33 +60,49 @@ class EarlyShift:
             for row in rows
         ]
 
+    async def _post_ntfy(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        studio: Dict[str, object],
+        topic: str,
+        payload: Dict[str, object],
+    ) -> None:
+        """Post a single ntfy.sh alert, logging failures instead of raising."""
+        async with semaphore:
+            try:
+                async with session.post(NTFY_URL, json=payload) as resp:
+                    if resp.status >= 400:
+                        text = await resp.text()
+                        logger.warning(
+                            f"ntfy alert failure for {studio['name']} ({topic}): "
+                            f"{resp.status} {text.strip()}"
+                        )
+            except Exception as exc:
+                logger.error(f"ntfy alert error for {studio['name']} ({topic}): {exc}")
+
     async def send_ntfy_alerts(self, games: List[Dict[str, object]], studios: List[Dict[str, object]]) -> None:
         """Send ntfy.sh alerts for trending games."""
-        async with aiohttp.ClientSession() as session:
-            for studio in studios:
-                topic = (studio.get("ntfy_topic") or "").strip()
-                if not topic:
-                    continue
-                for game in games:
-                    payload = {
-                        "topic": topic,
-                        "title": f"{game['game_name']} up {game['growth_percent']:.1f}%",
-                        "message": (
-                            f"Current CCU {game['current_ccu']:,} (peak {game['peak_ccu']:,} last 7d). "
-                            f"Week-ago baseline {game['week_ago_ccu']:,}."
-                        ),
-                        "priority": 5,
-                    }
-                    try:
-                        async with session.post(NTFY_URL, json=payload) as resp:
-                            if resp.status >= 400:
-                                text = await resp.text()
-                                logger.warning(
-                                    f"ntfy alert failure for {studio['name']} ({topic}): "
-                                    f"{resp.status} {text.strip()}"
-                                )
-                    except Exception as exc:
-                        logger.error(f"ntfy alert error for {studio['name']} ({topic}): {exc}")
+        session = await self._get_http()
+        semaphore = asyncio.Semaphore(NTFY_MAX_CONCURRENCY)
+        tasks = []
+        for studio in studios:
+            topic = (studio.get("ntfy_topic") or "").strip()
+            if not topic:
+                continue
+            for game in games:
+                payload = {
+                    "topic": topic,
+                    "title": f"{game['game_name']} up {game['growth_percent']:.1f}%",
+                    "message": (
+                        f"Current CCU {game['current_ccu']:,} (peak {game['peak_ccu']:,} last 7d). "
+                        f"Week-ago baseline {game['week_ago_ccu']:,}."
+                    ),
+                    "priority": 5,
+                }
+                tasks.append(self._post_ntfy(session, semaphore, studio, topic, payload))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     async def run_monitoring_cycle(self) -> None:
         """Run a single monitoring cycle."""
@@ -122,9 +130,20 @@ class EarlyShift:
 
     async def run_forever(self) -> None:
         """Run monitoring cycles continuously."""
-        while True:
-            await self.run_monitoring_cycle()
-            await asyncio.sleep(MONITORING_INTERVAL_HOURS * 60 * 60)
+        try:
+            while True:
+                await self.run_monitoring_cycle()
+                await asyncio.sleep(MONITORING_INTERVAL_HOURS * 60 * 60)
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP sessions and Notion clients."""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        await self.client.aclose()
+        await self.writer.aclose()
     
     def close(self) -> None:
         """Clean up resources."""
@@ -145,6 +164,13 @@ def add_test_studio(db_path: str = DEFAULT_DB_PATH) -> None:
     logger.info("Test studio inserted. Update credentials before using production alerts.")
 
 
+async def _run_once(early_shift: EarlyShift) -> None:
+    try:
+        await early_shift.run_monitoring_cycle()
+    finally:
+        await early_shift.aclose()
+
+
 if __name__ == "__main__":
     early_shift = EarlyShift()
-    asyncio.run(early_shift.run_monitoring_cycle())
\ No newline at end of file
+    asyncio.run(_run_once(early_shift))
\ No newline at end of file
@@ -7,9 +7,11 @@ import logging
 import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Dict, Iterable, List
 
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
 try:
     from notifications import NotificationManager, SpikeAlert
@@ -17,11 +19,16 @@ try:
 except ImportError:
     NOTIFICATIONS_AVAILABLE = False
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from constants import (
     DEFAULT_DB_PATH,
     FUZZ_THRESHOLD,
     GROWTH_THRESHOLD,
-    KEYWORD_HINTS,
     MENTION_LOOKBACK_HOURS,
     Tables,
 )
@@ -248,20 +255,22 @@ def classify_trend_phase(
 
 MECHANIC_PATTERNS = [
     re.compile(
-        r"(?i)\b(?:new|secret|update|introducing|added|unlock(?:ing)?|mechanic|feature|quest|code|rework|revamp|event|season|act|chapter|episode|boss|mode|map|weapon|pet|fusion|merge|system)\b[:\-\s]*(.*)"
+        r"\b(?:new|secret|update|introducing|added|unlock(?:ing)?|mechanic|feature|quest|code|rework|revamp|event|season|act|chapter|episode|boss|mode|map|weapon|pet|fusion|merge|system)\b[:\-\s]*(.*)",
+        re.IGNORECASE,
     ),
     re.compile(
-        r"(?i)\b(?:v\d+|version\s*\d+)\b[:\-\s]*(.*)"
+        r"\b(?:v\d+|version\s*\d+)\b[:\-\s]*(.*)",
+        re.IGNORECASE,
     ),
 ]
 
 # Specific mechanic extraction patterns for better accuracy
 SPECIFIC_MECHANIC_PATTERNS = [
-    re.compile(r"(?i)(fusion|merge)\s+(\w+(?:\s+\w+)?)(?:\s+(?:system|update|event))?"),
-    re.compile(r"(?i)(\w+)\s+(event|update|season)\s*[\:\-]?\s*(.*)"),
-    re.compile(r"(?i)new\s+(\w+(?:\s+\w+)?)\s+(code|pet|boss|weapon|map|mode)"),
-    re.compile(r"(?i)(christmas|winter|halloween|easter|summer)\s+(event|update)"),
-    re.compile(r"(?i)(\w+)\s+(rework|revamp|buff|nerf)"),
+    re.compile(r"(fusion|merge)\s+(\w+(?:\s+\w+)?)(?:\s+(?:system|update|event))?", re.IGNORECASE),
+    re.compile(r"(\w+)\s+(event|update|season)\s*[\:\-]?\s*(.*)", re.IGNORECASE),
+    re.compile(r"new\s+(\w+(?:\s+\w+)?)\s+(code|pet|boss|weapon|map|mode)", re.IGNORECASE),
+    re.compile(r"(christmas|winter|halloween|easter|summer)\s+(event|update)", re.IGNORECASE),
+    re.compile(r"(\w+)\s+(rework|revamp|buff|nerf)", re.IGNORECASE),
 ]
 
 MECHANIC_STOPWORDS = {
@@ -348,16 +357,21 @@ EVENT_PREFIXES = [
     r'update\s*\d*',
     r'event',
 ]
+EVENT_PREFIX_PATTERNS = [re.compile(rf'^{prefix}\s*', re.IGNORECASE) for prefix in EVENT_PREFIXES]
+BRACKETED_RE = re.compile(r'\[.*?\]')
+NAME_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\-\'"]')
 
+
+@lru_cache(maxsize=4096)
 def _clean_game_name(name: str) -> str:
     """Clean game name for better fuzzy matching - remove emojis, brackets, event prefixes."""
     # Remove all bracketed content like [UPDATE], [🎁DAY 4], etc.
-    clean = re.sub(r'\[.*?\]', '', name)
+    clean = BRACKETED_RE.sub('', name)
     # Remove emojis and special characters (keep only alphanumeric, spaces, hyphens, apostrophes)
-    clean = re.sub(r'[^\w\s\-\'"]', '', clean)
+    clean = NAME_SPECIAL_CHARS_RE.sub('', clean)
     # Remove common event prefixes
-    for prefix in EVENT_PREFIXES:
-        clean = re.sub(rf'^{prefix}\s*', '', clean, flags=re.IGNORECASE)
+    for pattern in EVENT_PREFIX_PATTERNS:
+        clean = pattern.sub('', clean)
     # Clean up whitespace
     clean = ' '.join(clean.split()).strip()
     return clean if clean else name  # Fall back to original if cleaning removes everything
@@ -403,12 +417,11 @@ def _extract_mechanic(
     description = description or ""
 
     sources = [title, description[:200] if description else ""]
+    # Strip the game name once per source; both pattern passes reuse it
+    stripped_sources = [_strip_game_name(source, game_name) for source in sources if source]
     
     # First try specific patterns for better accuracy
-    for source in sources:
-        if not source:
-            continue
-        source_stripped = _strip_game_name(source, game_name)
+    for source_stripped in stripped_sources:
         for pattern in SPECIFIC_MECHANIC_PATTERNS:
             match = pattern.search(source_stripped)
             if match:
@@ -420,10 +433,7 @@ def _extract_mechanic(
                         return candidate, True  # Specific match
     
     # Fall back to general patterns
-    for source in sources:
-        if not source:
-            continue
-        source_stripped = _strip_game_name(source, game_name)
+    for source_stripped in stripped_sources:
         for pattern in MECHANIC_PATTERNS:
             match = pattern.search(source_stripped)
             if match:
@@ -435,6 +445,16 @@ def _extract_mechanic(
     return (fallback if fallback else title[:120], False)
 
 
+INSERT_SPIKE_SQL = f"""
+    INSERT INTO {Tables.MECHANIC_SPIKES} (
+        universe_id, game_name, current_ccu, week_ago_ccu,
+        growth_percent, published_at, mechanic, mechanic_category,
+        video_title, video_url, channel_title, detected_at,
+        confidence_score, causality_type, video_count, channel_tier, trend_phase
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def _persist_spikes(db, spikes: List[MechanicSpike]) -> None:
     """Save detected spikes to database with confidence and causality data."""
     if not spikes:
@@ -446,15 +466,8 @@ def _persist_spikes(db, spikes: List[MechanicSpike]) -> None:
     _ensure_category_column(db)
     _ensure_confidence_columns(db)
     
-    for spike in spikes:
-        db.execute(f"""
-            INSERT INTO {Tables.MECHANIC_SPIKES} (
-                universe_id, game_name, current_ccu, week_ago_ccu,
-                growth_percent, published_at, mechanic, mechanic_category,
-                video_title, video_url, channel_title, detected_at,
-                confidence_score, causality_type, video_count, channel_tier, trend_phase
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    db.executemany(INSERT_SPIKE_SQL, [
+        (
             spike.universe_id,
             spike.game_name,
             spike.current_ccu,
@@ -472,7 +485,9 @@ def _persist_spikes(db, spikes: List[MechanicSpike]) -> None:
             spike.video_count,
             spike.channel_tier,
             spike.trend_phase,
-        ))
+        )
+        for spike in spikes
+    ])
     db.commit()
 
 
@@ -707,13 +722,74 @@ def _video_matches_game(game_name: str, video_title: str) -> bool:
         phrase = ' '.join(words[:2])
         if phrase in video_lower:
             return True
-    
-    for keyword in KEYWORD_HINTS:
-        if keyword in video_lower and clean_name in video_lower:
-            return True
     return False
 
 
+def _match_videos_to_games(game_names: List[str], video_titles: List[str]) -> List[tuple[int, int]]:
+    """
+    Batched equivalent of _video_matches_game over every (game, video) pair.
+
+    Scores the full name x title matrix in one rapidfuzz call instead of a
+    Python double loop.
+
+    Returns:
+        (game_index, video_index) pairs in row-major order
+    """
+    if not game_names or not video_titles:
+        return []
+
+    clean_names = [_clean_game_name(name).lower() for name in game_names]
+    titles_lower = [title.lower() for title in video_titles]
+
+    scores = process.cdist(
+        clean_names,
+        titles_lower,
+        scorer=fuzz.partial_ratio,
+        score_cutoff=FUZZ_THRESHOLD,
+        workers=-1,
+        # Cutoff is applied before the cast, so rounding can't lift a miss over it
+        dtype=np.uint8,
+    )
+    matched = scores >= FUZZ_THRESHOLD
+    _mark_phrase_matches(matched, clean_names, titles_lower)
+    return [(int(row), int(col)) for row, col in np.argwhere(matched)]
+
+
+def _mark_phrase_matches(
+    matched: np.ndarray,
+    clean_names: List[str],
+    titles_lower: List[str],
+) -> None:
+    """
+    Set matched[game, video] where the game's first two words appear in the title,
+    e.g. "Tower Defense Simulator" -> "tower defense".
+
+    With pyahocorasick installed every phrase is found in one pass per title;
+    otherwise each phrase is searched across all titles with numpy.
+    """
+    phrase_rows: Dict[str, List[int]] = {}
+    for row, clean_name in enumerate(clean_names):
+        words = clean_name.split()
+        if len(words) >= 2:
+            phrase_rows.setdefault(" ".join(words[:2]), []).append(row)
+    if not phrase_rows:
+        return
+
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for phrase, rows in phrase_rows.items():
+            automaton.add_word(phrase, rows)
+        automaton.make_automaton()
+        for col, title in enumerate(titles_lower):
+            for _, rows in automaton.iter(title):
+                matched[rows, col] = True
+        return
+
+    titles_array = np.array(titles_lower, dtype=str)
+    for phrase, rows in phrase_rows.items():
+        matched[rows] |= np.char.find(titles_array, phrase) >= 0
+
+
 async def _send_spike_notifications(spikes: List[MechanicSpike]) -> None:
     """Send notifications for detected spikes."""
     if not NOTIFICATIONS_AVAILABLE:
@@ -771,7 +847,8 @@ def detect_mechanic_spikes(
     Returns:
         List of detected MechanicSpike objects with confidence scores and causality
     """
-    with get_db_connection(db_path) as db:
+    # Read-only when not persisting: dashboard callers must not take DuckDB's write lock
+    with get_db_connection(db_path, read_only=not persist) as db:
         candidates = get_growth_candidates(db, growth_threshold)
         if not candidates:
             return []
@@ -783,44 +860,47 @@ def detect_mechanic_spikes(
         game_spikes: Dict[int, List[dict]] = {}
         detected_at = datetime.now(timezone.utc)
 
-        for candidate in candidates:
-            for video in videos:
-                title = video["title"] or ""
-                if not title:
-                    continue
-                if not _video_matches_game(candidate.game_name, title):
-                    continue
-                
-                mechanic, is_specific = _extract_mechanic(
-                    title,
-                    description=video.get("description"),
-                    game_name=candidate.game_name,
-                )
-                # Also categorize based on full context (title + game name)
-                category = categorize_mechanic(f"{title} {candidate.game_name}")
-                
-                # Get channel tier from video (pre-fetched from cache)
-                channel_tier = video.get("channel_tier", "small")
-                
-                spike_data = {
-                    "universe_id": candidate.universe_id,
-                    "game_name": candidate.game_name,
-                    "current_ccu": candidate.current_ccu,
-                    "week_ago_ccu": candidate.week_ago_ccu,
-                    "growth_percent": candidate.growth_percent,
-                    "published_at": video["published_at"],
-                    "mechanic": mechanic,
-                    "mechanic_category": category,
-                    "video_title": title,
-                    "video_url": f"https://youtube.com/watch?v={video['video_id']}",
-                    "channel_title": video["channel_title"],
-                    "channel_tier": channel_tier,
-                    "is_specific_match": is_specific,
-                }
-                
-                if candidate.universe_id not in game_spikes:
-                    game_spikes[candidate.universe_id] = []
-                game_spikes[candidate.universe_id].append(spike_data)
+        videos = [video for video in videos if video["title"]]
+        matches = _match_videos_to_games(
+            [candidate.game_name for candidate in candidates],
+            [video["title"] for video in videos],
+        )
+
+        for candidate_idx, video_idx in matches:
+            candidate = candidates[candidate_idx]
+            video = videos[video_idx]
+            title = video["title"]
+
+            mechanic, is_specific = _extract_mechanic(
+                title,
+                description=video.get("description"),
+                game_name=candidate.game_name,
+            )
+            # Also categorize based on full context (title + game name)
+            category = categorize_mechanic(f"{title} {candidate.game_name}")
+            
+            # Get channel tier from video (pre-fetched from cache)
+            channel_tier = video.get("channel_tier", "small")
+            
+            spike_data = {
+                "universe_id": candidate.universe_id,
+                "game_name": candidate.game_name,
+                "current_ccu": candidate.current_ccu,
+                "week_ago_ccu": candidate.week_ago_ccu,
+                "growth_percent": candidate.growth_percent,
+                "published_at": video["published_at"],
+                "mechanic": mechanic,
+                "mechanic_category": category,
+                "video_title": title,
+                "video_url": f"https://youtube.com/watch?v={video['video_id']}",
+                "channel_title": video["channel_title"],
+                "channel_tier": channel_tier,
+                "is_specific_match": is_specific,
+            }
+            
+            if candidate.universe_id not in game_spikes:
+                game_spikes[candidate.universe_id] = []
+            game_spikes[candidate.universe_id].append(spike_data)
         
         # Create aggregated spikes with confidence and causality
         spikes: List[MechanicSpike] = []
@@ -976,12 +1056,11 @@ def format_spikes_table(spikes: Iterable[MechanicSpike], include_confidence: boo
                     spike.published_at.strftime("%Y-%m-%d %H:%M"),
                 ]
             )
-    col_widths = [max(len(row[idx]) for row in rows) for idx in range(len(headers))]
-    lines: List[str] = []
-    for row in rows:
-        padded = [cell.ljust(col_widths[idx]) for idx, cell in enumerate(row)]
-        lines.append(" | ".join(padded))
-    return "\n".join(lines)
+    col_widths = [max(map(len, column)) for column in zip(*rows)]
+    return "\n".join(
+        " | ".join(cell.ljust(width) for cell, width in zip(row, col_widths))
+        for row in rows
+    )
 
 
 def get_category_summary(db_path: str = DEFAULT_DB_PATH, days: int = 7) -> dict:
@@ -7,25 +7,32 @@ import logging
 from datetime import datetime
 from typing import Dict, List
 
-from notion_client import Client
+from notion_client import AsyncClient
 from notion_client.errors import APIResponseError
 
+from constants import NOTION_MAX_CONCURRENCY
 from exceptions import NotionAPIError
 
 logger = logging.getLogger(__name__)
 
 
 class NotionWriter:
-    """Writes game trends to each studio's Notion database using the official client."""
+    """Writes game trends to each studio's Notion database using the official async client."""
 
     def __init__(self) -> None:
-        self._clients: Dict[str, Client] = {}
+        self._clients: Dict[str, AsyncClient] = {}
 
-    def _client_for(self, token: str) -> Client:
+    def _client_for(self, token: str) -> AsyncClient:
         if token not in self._clients:
-            self._clients[token] = Client(auth=token)
+            self._clients[token] = AsyncClient(auth=token)
         return self._clients[token]
 
+    async def aclose(self) -> None:
+        """Close every cached Notion client."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
     async def send_to_notion(self, studio: Dict[str, object], game: Dict[str, object]) -> None:
         """Send a trending game notification to a studio's Notion database."""
         token = (studio.get("notion_token") or "").strip()
@@ -53,8 +60,7 @@ class NotionWriter:
         }
 
         try:
-            await asyncio.to_thread(
-                client.pages.create,
+            await client.pages.create(
                 parent={"database_id": database_id},
                 properties=properties,
             )
@@ -72,16 +78,27 @@ class NotionWriter:
             logger.error(f"Unexpected Notion error for {studio_name}: {exc}")
             raise
 
+    async def _send_bounded(
+        self,
+        semaphore: asyncio.Semaphore,
+        studio: Dict[str, object],
+        game: Dict[str, object],
+    ) -> None:
+        """Send one notification while holding a slot of the shared concurrency limit."""
+        async with semaphore:
+            await self.send_to_notion(studio, game)
+
     async def notify_studios(
         self,
         trending_games: List[Dict[str, object]],
         studios: List[Dict[str, object]],
     ) -> None:
         """Send notifications for all trending games to all studios."""
+        semaphore = asyncio.Semaphore(NOTION_MAX_CONCURRENCY)
         tasks = []
         for game in trending_games:
             for studio in studios:
-                tasks.append(self.send_to_notion(studio, game))
+                tasks.append(self._send_bounded(semaphore, studio, game))
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
 
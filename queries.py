@@ -4,12 +4,15 @@ queries.py - Shared SQL queries for Early Shift
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from typing import TYPE_CHECKING, Dict, List
 
 import duckdb
 
 from constants import Tables
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 @dataclass
 class TrendingGame:
@@ -22,80 +25,252 @@ class TrendingGame:
     growth_rate: float
     peak_ccu: int
     timestamp: datetime
+
+
+SUBSCRIBED_STUDIOS_QUERY = f"""
+    SELECT studio_id, name, notion_token, notion_database_id, ntfy_topic
+    FROM {Tables.STUDIOS}
+"""
+
+
+def _latest_snapshot_sql(where: str = "") -> str:
+    """
+    Newest snapshot per universe, shaped like games_latest.
     
-    @classmethod
-    def from_db_row(cls, row: tuple) -> "TrendingGame":
-        """Create TrendingGame from database row."""
-        return cls(
-            universe_id=row[0],
-            game_name=row[1] or "Unknown",
-            current_ccu=row[2] or 0,
-            week_ago_ccu=row[3] or 0,
-            growth_percent=float(row[4] or 0.0),
-            growth_rate=float(row[5] or 0.0),
-            peak_ccu=row[6] or row[2] or 0,
-            timestamp=row[7],
-        )
+    The display name (metadata name, else snapshot name) is denormalized here
+    so readers don't need to join game_metadata.
+    """
+    return f"""
+        SELECT latest.universe_id,
+               COALESCE(meta.name, latest.name) AS name,
+               latest.ccu,
+               latest.timestamp
+        FROM (
+            SELECT universe_id,
+                   arg_max(name, timestamp) AS name,
+                   arg_max(ccu, timestamp) AS ccu,
+                   max(timestamp) AS timestamp
+            FROM {Tables.GAMES}
+            {where}
+            GROUP BY universe_id
+        ) latest
+        LEFT JOIN {Tables.GAME_METADATA} meta ON meta.universe_id = latest.universe_id
+    """
 
 
-# SQL query to find trending games with significant growth
-TRENDING_GAMES_QUERY = f"""
-    WITH latest_snapshot AS (
+def _week_ago_snapshot_sql(where: str = "") -> str:
+    """Newest snapshot per universe at least 7 days old, shaped like games_7d_ago."""
+    return f"""
         SELECT universe_id,
-               name,
-               ccu,
-               timestamp,
-               ROW_NUMBER() OVER (PARTITION BY universe_id ORDER BY timestamp DESC) AS row_num
-        FROM {Tables.GAMES}
-    ),
-    filtered_latest AS (
-        SELECT universe_id, name, ccu, timestamp
-        FROM latest_snapshot
-        WHERE row_num = 1
-    ),
-    week_ago_snapshot AS (
-        SELECT universe_id,
-               ccu,
-               timestamp,
-               ROW_NUMBER() OVER (PARTITION BY universe_id ORDER BY timestamp DESC) AS row_num
+               arg_max(ccu, timestamp) AS ccu,
+               max(timestamp) AS timestamp
         FROM {Tables.GAMES}
         WHERE timestamp <= current_timestamp - INTERVAL 7 DAY
-    ),
-    filtered_week_ago AS (
-        SELECT universe_id, ccu, timestamp
-        FROM week_ago_snapshot
-        WHERE row_num = 1
-    ),
-    peak_7d AS (
-        SELECT universe_id,
-               MAX(ccu) AS peak_ccu
-        FROM {Tables.GAMES}
-        WHERE timestamp >= current_timestamp - INTERVAL 7 DAY
+          {where}
         GROUP BY universe_id
-    )
-    SELECT cur.universe_id,
-           COALESCE(meta.name, cur.name) AS game_name,
-           cur.ccu AS current_ccu,
-           prev.ccu AS week_ago_ccu,
-           ((cur.ccu - prev.ccu) * 100.0) / NULLIF(prev.ccu, 0) AS growth_percent,
-           ((cur.ccu - prev.ccu) * 1.0) / NULLIF(prev.ccu, 0) AS growth_rate,
-           COALESCE(peak.peak_ccu, cur.ccu) AS peak_ccu,
-           cur.timestamp AS current_timestamp
-    FROM filtered_latest cur
-    JOIN filtered_week_ago prev ON prev.universe_id = cur.universe_id
-    LEFT JOIN {Tables.GAME_METADATA} meta ON meta.universe_id = cur.universe_id
-    LEFT JOIN peak_7d peak ON peak.universe_id = cur.universe_id
-    WHERE prev.ccu > 0
+    """
+
+
+def _rollup_refresh_filter(rollup: str) -> str:
+    """
+    WHERE terms for an incremental rollup refresh; binds ``since`` (may be NULL).
+    
+    Scans snapshots at or after the older of ``since`` and the newest one
+    already rolled up, and never lets a snapshot replace a newer rollup row.
+    """
+    return f"""
+        {Tables.GAMES}.timestamp >= COALESCE(
+            least(?::TIMESTAMP, (SELECT max(timestamp) FROM {rollup})),
+            TIMESTAMP '-infinity'
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM {rollup} rolled
+            WHERE rolled.universe_id = {Tables.GAMES}.universe_id
+              AND rolled.timestamp > {Tables.GAMES}.timestamp
+        )
+    """
+
+
+REFRESH_GAMES_LATEST_SQL = f"""
+    INSERT OR REPLACE INTO {Tables.GAMES_LATEST}
+    {_latest_snapshot_sql("WHERE " + _rollup_refresh_filter(Tables.GAMES_LATEST))}
+"""
+
+REFRESH_GAMES_WEEK_AGO_SQL = f"""
+    INSERT OR REPLACE INTO {Tables.GAMES_WEEK_AGO}
+    {_week_ago_snapshot_sql("AND " + _rollup_refresh_filter(Tables.GAMES_WEEK_AGO))}
 """
 
+# (latest, week_ago) sources for the snapshot queries below: the rollup tables,
+# or the same snapshots aggregated from games; snapshot_sources() picks one
+_ROLLUP_SOURCES = (Tables.GAMES_LATEST, Tables.GAMES_WEEK_AGO)
+_AGGREGATE_SOURCES = (f"({_latest_snapshot_sql()})", f"({_week_ago_snapshot_sql()})")
 
-def get_trending_games(
+
+def refresh_snapshot_rollups(
+    db: duckdb.DuckDBPyConnection,
+    since: datetime | None = None,
+) -> None:
+    """
+    Bring games_latest and games_7d_ago up to date with the games table.
+    
+    Only snapshots at or after the newest one already rolled up are scanned,
+    so a refresh after an in-order poll touches one batch and the first call
+    on an empty rollup backfills it. Snapshots written with an older timestamp
+    are only picked up when ``since`` reaches back to them; pass the written
+    batch's timestamp after every write.
+    
+    Args:
+        db: Database connection (writable)
+        since: Timestamp of the snapshots just written, if any
+    """
+    db.execute(REFRESH_GAMES_LATEST_SQL, [since])
+    db.execute(REFRESH_GAMES_WEEK_AGO_SQL, [since])
+
+
+def snapshot_rollups_ready(db: duckdb.DuckDBPyConnection) -> bool:
+    """
+    Check whether the snapshot rollups exist and have been backfilled.
+    
+    A read-only connection to a database no writer has opened since the
+    rollups were introduced sees them missing or empty.
+    
+    Args:
+        db: Database connection
+    """
+    found = db.execute(
+        "SELECT count(DISTINCT table_name) FROM information_schema.tables WHERE table_name IN (?, ?)",
+        list(_ROLLUP_SOURCES),
+    ).fetchone()[0]
+    if found < len(_ROLLUP_SOURCES):
+        return False
+    return db.execute(f"SELECT EXISTS (SELECT 1 FROM {Tables.GAMES_LATEST})").fetchone()[0]
+
+
+def snapshot_sources(db: duckdb.DuckDBPyConnection) -> tuple[str, str]:
+    """
+    Pick the (latest, week_ago) snapshot sources for a connection.
+    
+    The rollup tables when they are ready, else the same snapshots aggregated
+    from the games table.
+    
+    Args:
+        db: Database connection
+    """
+    return _ROLLUP_SOURCES if snapshot_rollups_ready(db) else _AGGREGATE_SOURCES
+
+
+# SQL query to find trending games with significant growth
+def _trending_games_query(latest: str, week_ago: str) -> str:
+    return f"""
+        WITH peak_7d AS (
+            SELECT universe_id,
+                   MAX(ccu) AS peak_ccu
+            FROM {Tables.GAMES}
+            WHERE timestamp >= current_timestamp - INTERVAL 7 DAY
+            GROUP BY universe_id
+        )
+        SELECT cur.universe_id,
+               cur.name AS game_name,
+               cur.ccu AS current_ccu,
+               prev.ccu AS week_ago_ccu,
+               ((cur.ccu - prev.ccu) * 100.0) / NULLIF(prev.ccu, 0) AS growth_percent,
+               ((cur.ccu - prev.ccu) * 1.0) / NULLIF(prev.ccu, 0) AS growth_rate,
+               COALESCE(peak.peak_ccu, cur.ccu) AS peak_ccu,
+               cur.timestamp AS current_timestamp
+        FROM {latest} cur
+        JOIN {week_ago} prev ON prev.universe_id = cur.universe_id
+        LEFT JOIN peak_7d peak ON peak.universe_id = cur.universe_id
+        WHERE prev.ccu > 0
+    """
+
+
+# Top movers for the dashboards: rank on the snapshots first, then scan games for
+# the 7-day peak of only the returned rows. Binds (growth_threshold, limit);
+# columns match _trending_games_query.
+def _top_movers_query(latest: str, week_ago: str) -> str:
+    return f"""
+        WITH movers AS (
+            SELECT cur.universe_id,
+                   cur.name AS game_name,
+                   cur.ccu AS current_ccu,
+                   prev.ccu AS week_ago_ccu,
+                   ((cur.ccu - prev.ccu) * 100.0) / prev.ccu AS growth_percent,
+                   ((cur.ccu - prev.ccu) * 1.0) / prev.ccu AS growth_rate,
+                   cur.timestamp AS current_timestamp
+            FROM {latest} cur
+            JOIN {week_ago} prev ON prev.universe_id = cur.universe_id
+            WHERE prev.ccu > 0
+              AND ((cur.ccu - prev.ccu) * 1.0) / prev.ccu >= ?
+            ORDER BY growth_percent DESC
+            LIMIT ?
+        ),
+        peak_7d AS (
+            SELECT universe_id,
+                   MAX(ccu) AS peak_ccu
+            FROM {Tables.GAMES}
+            WHERE timestamp >= current_timestamp - INTERVAL 7 DAY
+              AND universe_id IN (SELECT universe_id FROM movers)
+            GROUP BY universe_id
+        )
+        SELECT movers.universe_id,
+               movers.game_name,
+               movers.current_ccu,
+               movers.week_ago_ccu,
+               movers.growth_percent,
+               movers.growth_rate,
+               COALESCE(peak.peak_ccu, movers.current_ccu) AS peak_ccu,
+               movers.current_timestamp
+        FROM movers
+        LEFT JOIN peak_7d peak ON peak.universe_id = movers.universe_id
+        ORDER BY movers.growth_percent DESC
+    """
+
+
+def top_movers(
+    db: duckdb.DuckDBPyConnection,
+    growth_threshold: float,
+    limit: int,
+) -> "pd.DataFrame":
+    """
+    Query the fastest-growing games for the dashboards.
+    
+    Args:
+        db: Database connection
+        growth_threshold: Minimum growth rate (as decimal, e.g., 0.25 for 25%)
+        limit: Maximum number of results to return
+        
+    Returns:
+        DataFrame with one row per game, highest growth first
+    """
+    query = _top_movers_query(*snapshot_sources(db))
+    return db.execute(query, (growth_threshold, limit)).df()
+
+
+# Trending games shaped as TrendingGame records, with NULL defaults filled in SQL
+def _trending_alerts_query(latest: str, week_ago: str) -> str:
+    return f"""
+        SELECT trending.universe_id,
+               COALESCE(trending.game_name, 'Unknown') AS game_name,
+               COALESCE(trending.current_ccu, 0) AS current_ccu,
+               COALESCE(trending.week_ago_ccu, 0) AS week_ago_ccu,
+               COALESCE(trending.growth_percent, 0.0) AS growth_percent,
+               COALESCE(trending.growth_rate, 0.0) AS growth_rate,
+               COALESCE(NULLIF(trending.peak_ccu, 0), trending.current_ccu, 0) AS peak_ccu,
+               trending.current_timestamp AS timestamp
+        FROM ({_trending_games_query(latest, week_ago)}) trending
+    """
+
+
+def get_trending_game_records(
     db: duckdb.DuckDBPyConnection,
     growth_threshold: float = 0.0,
-    limit: int | None = None
-) -> List[TrendingGame]:
+    limit: int | None = None,
+) -> List[Dict[str, object]]:
     """
-    Query trending games with significant growth.
+    Query trending games as plain dicts for the alert writers.
+    
+    Materializes through Arrow so rows become dicts in one C++ pass.
     
     Args:
         db: Database connection
@@ -103,20 +278,42 @@ def get_trending_games(
         limit: Maximum number of results to return
         
     Returns:
-        List of TrendingGame objects
+        List of dicts keyed like TrendingGame fields
     """
-    query = TRENDING_GAMES_QUERY
+    query = _trending_alerts_query(*snapshot_sources(db))
+    params: List[float | int] = []
     
     if growth_threshold > 0:
-        query += f" AND ((cur.ccu - prev.ccu) * 1.0) / NULLIF(prev.ccu, 0) >= {growth_threshold}"
+        query += " WHERE trending.growth_rate >= ?"
+        params.append(growth_threshold)
     
-    query += " ORDER BY growth_percent DESC"
+    query += " ORDER BY trending.growth_percent DESC"
     
     if limit:
-        query += f" LIMIT {limit}"
+        query += " LIMIT ?"
+        params.append(limit)
     
-    rows = db.execute(query).fetchall()
-    return [TrendingGame.from_db_row(row) for row in rows]
+    return db.execute(query, params).fetch_arrow_table().to_pylist()
+
+
+def get_trending_games(
+    db: duckdb.DuckDBPyConnection,
+    growth_threshold: float = 0.0,
+    limit: int | None = None
+) -> List[TrendingGame]:
+    """
+    Query trending games with significant growth.
+    
+    Args:
+        db: Database connection
+        growth_threshold: Minimum growth rate (as decimal, e.g., 0.25 for 25%)
+        limit: Maximum number of results to return
+        
+    Returns:
+        List of TrendingGame objects
+    """
+    records = get_trending_game_records(db, growth_threshold, limit)
+    return [TrendingGame(**record) for record in records]
 
 
 @dataclass
@@ -143,45 +340,20 @@ class GrowthCandidate:
         )
 
 
-# SQL query for growth candidates (without peak CCU calculation)
-GROWTH_CANDIDATES_QUERY = f"""
-    WITH latest_snapshot AS (
-        SELECT universe_id,
-               name,
-               ccu,
-               timestamp,
-               ROW_NUMBER() OVER (PARTITION BY universe_id ORDER BY timestamp DESC) AS row_num
-        FROM {Tables.GAMES}
-    ),
-    filtered_latest AS (
-        SELECT universe_id, name, ccu, timestamp
-        FROM latest_snapshot
-        WHERE row_num = 1
-    ),
-    week_ago_snapshot AS (
-        SELECT universe_id,
-               ccu,
-               timestamp,
-               ROW_NUMBER() OVER (PARTITION BY universe_id ORDER BY timestamp DESC) AS row_num
-        FROM {Tables.GAMES}
-        WHERE timestamp <= current_timestamp - INTERVAL 7 DAY
-    ),
-    filtered_week_ago AS (
-        SELECT universe_id, ccu, timestamp
-        FROM week_ago_snapshot
-        WHERE row_num = 1
-    )
-    SELECT cur.universe_id,
-           COALESCE(meta.name, cur.name) AS game_name,
-           cur.ccu AS current_ccu,
-           prev.ccu AS week_ago_ccu,
-           ((cur.ccu - prev.ccu) * 1.0) / NULLIF(prev.ccu, 0) AS growth_rate,
-           cur.timestamp AS current_timestamp
-    FROM filtered_latest cur
-    JOIN filtered_week_ago prev ON prev.universe_id = cur.universe_id
-    LEFT JOIN {Tables.GAME_METADATA} meta ON meta.universe_id = cur.universe_id
-    WHERE prev.ccu > 0
-"""
+# SQL query for growth candidates (without peak CCU calculation); binds the growth threshold
+def _growth_candidates_query(latest: str, week_ago: str) -> str:
+    return f"""
+        SELECT cur.universe_id,
+               cur.name AS game_name,
+               cur.ccu AS current_ccu,
+               prev.ccu AS week_ago_ccu,
+               ((cur.ccu - prev.ccu) * 1.0) / NULLIF(prev.ccu, 0) AS growth_rate,
+               cur.timestamp AS current_timestamp
+        FROM {latest} cur
+        JOIN {week_ago} prev ON prev.universe_id = cur.universe_id
+        WHERE prev.ccu > 0
+          AND ((cur.ccu - prev.ccu) * 1.0) / prev.ccu >= ?
+    """
 
 
 def get_growth_candidates(
@@ -198,13 +370,6 @@ def get_growth_candidates(
     Returns:
         List of GrowthCandidate objects
     """
-    rows = db.execute(GROWTH_CANDIDATES_QUERY).fetchall()
-    candidates = []
-    
-    for row in rows:
-        growth_rate = row[4]
-        if growth_rate is None or growth_rate < growth_threshold:
-            continue
-        candidates.append(GrowthCandidate.from_db_row(row))
-    
-    return candidates
\ No newline at end of file
+    query = _growth_candidates_query(*snapshot_sources(db))
+    rows = db.execute(query, [growth_threshold]).fetchall()
+    return [GrowthCandidate.from_db_row(row) for row in rows]
\ No newline at end of file
@@ -8,11 +8,13 @@ import asyncio
 import json
 import logging
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import aiohttp
+import duckdb
+import pyarrow as pa
 
 from constants import (
     DEFAULT_CACHE_HOURS,
@@ -21,14 +23,69 @@ from constants import (
     FALLBACK_UNIVERSES,
     ROPROXY_BASE_URL,
     ROPROXY_DISCOVERY_ENDPOINTS,
+    ROPROXY_UNIVERSE_BATCH_SIZE,
     Tables,
 )
 from db_manager import DatabaseManager
 from exceptions import RobloxAPIError
+from json_utils import aloads as json_aloads, dumps as json_dumps, loads as json_loads
+from queries import refresh_snapshot_rollups
 from schema import SchemaManager
 
 logger = logging.getLogger(__name__)
 
+HTTP_HEADERS = {
+    "User-Agent": "EarlyShiftBot/1.0 (+https://github.com/SanchitSharma10)",
+    "Accept": "application/json",
+}
+
+# FALLBACK_UNIVERSES repeats a few IDs; dedupe once so every ID list handed
+# around here is already unique
+FALLBACK_UNIVERSE_IDS = list(dict.fromkeys(FALLBACK_UNIVERSES))
+
+# Name the polled batch is registered under while it is written
+SNAPSHOT_BATCH_VIEW = "roproxy_snapshot_batch"
+
+SNAPSHOT_BATCH_SCHEMA = pa.schema([
+    ("universe_id", pa.int64()),
+    ("name", pa.string()),
+    ("ccu", pa.int64()),
+    ("root_place_id", pa.int64()),
+    ("description", pa.string()),
+    ("creator_id", pa.int64()),
+    ("creator_name", pa.string()),
+    ("genre", pa.string()),
+    ("visits", pa.int64()),
+])
+
+UPSERT_METADATA_SQL = f"""
+    INSERT OR REPLACE INTO {Tables.GAME_METADATA} (
+        universe_id, name, root_place_id, creator_id, creator_name,
+        description, genre, visits, last_seen_ccu, updated_at
+    )
+    SELECT universe_id, name, root_place_id, creator_id, creator_name,
+           description, genre, visits, ccu, ?
+    FROM {SNAPSHOT_BATCH_VIEW}
+"""
+
+# Clear any rows already stored for this (universe_id, timestamp) before inserting
+DELETE_GAMES_SQL = f"""
+    DELETE FROM {Tables.GAMES}
+    WHERE timestamp = ?
+      AND universe_id IN (SELECT universe_id FROM {SNAPSHOT_BATCH_VIEW})
+"""
+
+INSERT_GAMES_SQL = f"""
+    INSERT INTO {Tables.GAMES} (universe_id, name, ccu, timestamp)
+    SELECT universe_id, name, ccu, ?
+    FROM {SNAPSHOT_BATCH_VIEW}
+"""
+
+
+def _utcnow() -> datetime:
+    """Naive UTC now, the form snapshot timestamps and the cache are stored in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 @dataclass
 class UniverseSnapshot:
@@ -58,108 +115,188 @@ class RoProxyClient:
         self.cache_ttl = timedelta(hours=cache_hours)
         self.http_timeout = aiohttp.ClientTimeout(total=20)
         self.max_concurrency = max(1, max_concurrency)
+        self._http: aiohttp.ClientSession | None = None
         self._init_db()
 
+    async def _get_http(self) -> aiohttp.ClientSession:
+        """Lazily create the session reused by discovery and every poll."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                timeout=self.http_timeout,
+                headers=HTTP_HEADERS,
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300),
+            )
+        return self._http
+
     def _init_db(self) -> None:
         """Initialize database schema."""
         SchemaManager._ensure_games_tables(self.db_manager.db)
         self.db_manager.db.commit()
 
-    async def _fetch_top_universes(self, limit: int) -> List[int]:
+    async def _fetch_top_universes(
+        self, limit: int, cached: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[int], Dict[str, Any]]:
+        """
+        Page through the discovery endpoints for popular universe IDs.
+
+        When ``cached`` holds validators for an endpoint, its first page is a
+        conditional GET. On a 304 that page's IDs come from the cache instead
+        of being re-parsed, and paging resumes from its stored cursor, so
+        later pages are always fetched fresh.
+        Returns the IDs and the validators to persist for the next refresh.
+        """
         universe_ids: List[int] = []
         seen: set[int] = set()
-        headers = {
-            "User-Agent": "EarlyShiftBot/1.0 (+https://github.com/SanchitSharma10)",
-            "Accept": "application/json",
-        }
-        async with aiohttp.ClientSession(timeout=self.http_timeout, headers=headers) as session:
-            for endpoint in ROPROXY_DISCOVERY_ENDPOINTS:
-                cursor: Optional[str] = None
-                try:
-                    while len(universe_ids) < limit:
-                        params = {
-                            "SortType": "Popular",
-                            "Limit": min(100, limit - len(universe_ids)),
-                        }
-                        if cursor:
-                            params["Cursor"] = cursor
-                        async with session.get(endpoint, params=params) as resp:
-                            if resp.status != 200:
-                                break
-                            payload = await resp.json()
-                        data = payload.get("data") or payload.get("universes")
-                        if not data:
+        validators: Dict[str, Any] = {}
+        cached = cached or {}
+        cached_ids = [int(uid) for uid in cached.get("universe_ids", [])]
+        session = await self._get_http()
+        for endpoint in ROPROXY_DISCOVERY_ENDPOINTS:
+            cursor: Optional[str] = None
+            try:
+                while len(universe_ids) < limit:
+                    params = {
+                        "SortType": "Popular",
+                        "Limit": min(100, limit - len(universe_ids)),
+                    }
+                    headers: Dict[str, str] = {}
+                    if cursor:
+                        params["Cursor"] = cursor
+                    elif (
+                        cached_ids
+                        and cached.get("endpoint") == endpoint
+                        and cached.get("page_limit") == params["Limit"]
+                    ):
+                        if cached.get("etag"):
+                            headers["If-None-Match"] = cached["etag"]
+                        if cached.get("last_modified"):
+                            headers["If-Modified-Since"] = cached["last_modified"]
+                    async with session.get(endpoint, params=params, headers=headers) as resp:
+                        if resp.status == 304:
+                            page_ids = cached_ids[:cached["first_page_size"]]
+                            next_cursor = cached.get("next_cursor")
+                            validators = {
+                                key: cached.get(key) for key in ("endpoint", "etag", "last_modified")
+                            }
+                        elif resp.status != 200:
                             break
-                        for entry in data:
-                            universe_id = entry.get("id") or entry.get("universeId")
-                            if not universe_id:
-                                continue
-                            uid = int(universe_id)
-                            if uid in seen:
-                                continue
-                            seen.add(uid)
-                            universe_ids.append(uid)
-                            if len(universe_ids) >= limit:
-                                break
-                        cursor = payload.get("nextPageCursor") or payload.get("nextPageToken")
-                        if not cursor:
+                        else:
+                            payload = json_loads(await resp.read())
+                            data = payload.get("data") or payload.get("universes") or []
+                            page_ids = [entry.get("id") or entry.get("universeId") for entry in data]
+                            next_cursor = payload.get("nextPageCursor") or payload.get("nextPageToken")
+                            if not cursor:
+                                validators = {
+                                    "endpoint": endpoint,
+                                    "etag": resp.headers.get("ETag"),
+                                    "last_modified": resp.headers.get("Last-Modified"),
+                                }
+                    if not page_ids:
+                        break
+                    for universe_id in page_ids:
+                        if not universe_id:
+                            continue
+                        uid = int(universe_id)
+                        if uid in seen:
+                            continue
+                        seen.add(uid)
+                        universe_ids.append(uid)
+                        if len(universe_ids) >= limit:
                             break
-                except Exception as exc:
-                    logger.warning(f"Unable to fetch discovery data from {endpoint}: {exc}")
-                if universe_ids:
-                    break
-        return universe_ids
+                    if not cursor:
+                        # What a 304 on this page needs to stand in for it next time
+                        validators["page_limit"] = params["Limit"]
+                        validators["first_page_size"] = len(universe_ids)
+                        validators["next_cursor"] = next_cursor
+                    cursor = next_cursor
+                    if not cursor:
+                        break
+            except Exception as exc:
+                logger.warning(f"Unable to fetch discovery data from {endpoint}: {exc}")
+            if universe_ids:
+                break
+        return universe_ids, validators
 
-    def _load_cached_universes(self) -> Optional[List[int]]:
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
         if not self.cache_path.exists():
             return None
         try:
-            cached = json.loads(self.cache_path.read_text())
+            return json_loads(self.cache_path.read_bytes())
         except json.JSONDecodeError:
             return None
+
+    def _is_cache_fresh(self, cached: Dict[str, Any], now: datetime) -> bool:
         timestamp = cached.get("generated_at")
         if not timestamp:
-            return None
-        generated_at = datetime.fromisoformat(timestamp)
-        if datetime.utcnow() - generated_at > self.cache_ttl:
-            return None
-        return [int(uid) for uid in cached.get("universe_ids", [])]
+            return False
+        return now - datetime.fromisoformat(timestamp) <= self.cache_ttl
 
-    def _save_cached_universes(self, universe_ids: Iterable[int]) -> None:
+    def _save_cached_universes(
+        self,
+        universe_ids: Sequence[int],
+        now: datetime,
+        validators: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Cache an already-unique list of universe IDs with its HTTP validators."""
         payload = {
-            "generated_at": datetime.utcnow().isoformat(),
-            "universe_ids": list(dict.fromkeys(int(uid) for uid in universe_ids)),
+            "generated_at": now.isoformat(),
+            "universe_ids": list(universe_ids),
+            **(validators or {}),
         }
-        self.cache_path.write_text(json.dumps(payload))
+        self.cache_path.write_bytes(json_dumps(payload))
 
     async def get_top_universe_ids(self, limit: int = 500) -> List[int]:
-        cached = self._load_cached_universes()
-        if cached:
-            return cached[:limit]
-        universe_ids = await self._fetch_top_universes(limit)
+        now = _utcnow()
+        cached = self._read_cache()
+        if cached and self._is_cache_fresh(cached, now) and cached.get("universe_ids"):
+            return [int(uid) for uid in cached["universe_ids"][:limit]]
+        universe_ids, validators = await self._fetch_top_universes(limit, cached)
         if universe_ids:
-            self._save_cached_universes(universe_ids)
+            self._save_cached_universes(universe_ids, now, validators)
             return universe_ids
         logger.warning("Using fallback universe list; discovery APIs unavailable.")
-        self._save_cached_universes(FALLBACK_UNIVERSES)
-        return FALLBACK_UNIVERSES[:limit]
+        self._save_cached_universes(FALLBACK_UNIVERSE_IDS, now)
+        return FALLBACK_UNIVERSE_IDS[:limit]
 
-    async def _fetch_universe_snapshot(
+    @staticmethod
+    def _empty_snapshot(universe_id: int) -> UniverseSnapshot:
+        return UniverseSnapshot(
+            universe_id=universe_id,
+            name="Unknown",
+            ccu=0,
+            root_place_id=None,
+            description=None,
+            creator_id=None,
+            creator_name=None,
+            genre=None,
+            visits=None,
+        )
+
+    async def _fetch_universe_batch(
         self,
         session: aiohttp.ClientSession,
-        universe_id: int,
-    ) -> UniverseSnapshot:
-        url = f"{self.base_url}?universeIds={universe_id}"
+        universe_ids: Sequence[int],
+    ) -> List[UniverseSnapshot]:
+        """
+        Fetch one /v1/games page for several universes.
+
+        IDs missing from a successful response get an empty snapshot. A failed
+        request returns nothing, so one throttled batch doesn't zero out its
+        universes' CCU and metadata.
+        """
+        url = f"{self.base_url}?universeIds={','.join(map(str, universe_ids))}"
+        found: Dict[int, UniverseSnapshot] = {}
         try:
             async with session.get(url) as resp:
                 if resp.status == 200:
-                    payload = await resp.json()
-                    data = payload.get("data")
-                    if data:
-                        game = data[0]
+                    payload = await json_aloads(await resp.read())
+                    for game in payload.get("data") or []:
+                        universe_id = game.get("id")
+                        if universe_id is None:
+                            continue
                         creator = game.get("creator") or {}
-                        return UniverseSnapshot(
-                            universe_id=universe_id,
+                        found[int(universe_id)] = UniverseSnapshot(
+                            universe_id=int(universe_id),
                             name=game.get("name", "Unknown"),
                             ccu=game.get("playing", 0),
                             root_place_id=game.get("rootPlaceId"),
@@ -169,79 +306,117 @@ class RoProxyClient:
                             genre=game.get("genre"),
                             visits=game.get("visits"),
                         )
+                else:
+                    logger.warning(f"Universe batch of {len(universe_ids)} returned HTTP {resp.status}")
+                    return []
         except Exception as exc:
-            print(f"Error fetching universe {universe_id}: {exc}")
-        return UniverseSnapshot(
-            universe_id=universe_id,
-            name="Unknown",
-            ccu=0,
-            root_place_id=None,
-            description=None,
-            creator_id=None,
-            creator_name=None,
-            genre=None,
-            visits=None,
-        )
+            logger.warning(f"Error fetching universe batch of {len(universe_ids)}: {exc}")
+            return []
+        return [found.get(uid) or self._empty_snapshot(uid) for uid in universe_ids]
 
-    def _upsert_metadata(self, snapshot: UniverseSnapshot) -> None:
-        """Update game metadata in database."""
-        self.db_manager.db.execute(
-            f"""
-            INSERT OR REPLACE INTO {Tables.GAME_METADATA} (
-                universe_id, name, root_place_id, creator_id, creator_name,
-                description, genre, visits, last_seen_ccu, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                snapshot.universe_id,
-                snapshot.name,
-                snapshot.root_place_id,
-                snapshot.creator_id,
-                snapshot.creator_name,
-                snapshot.description,
-                snapshot.genre,
-                snapshot.visits,
-                snapshot.ccu,
-                datetime.utcnow(),
-            ),
+    @staticmethod
+    def _write_snapshots(
+        db: duckdb.DuckDBPyConnection,
+        snapshots: Sequence[UniverseSnapshot],
+        timestamp: datetime,
+    ) -> None:
+        """Write metadata and CCU rows for a poll as set-based statements."""
+        # Columnar build: one list per schema field (all UniverseSnapshot attributes)
+        batch = pa.Table.from_pydict(
+            {
+                field: [getattr(snapshot, field) for snapshot in snapshots]
+                for field in SNAPSHOT_BATCH_SCHEMA.names
+            },
+            schema=SNAPSHOT_BATCH_SCHEMA,
         )
+        db.register(SNAPSHOT_BATCH_VIEW, batch)
+        try:
+            # The poll timestamp doubles as the metadata updated_at
+            db.execute(UPSERT_METADATA_SQL, (timestamp,))
+            db.execute(DELETE_GAMES_SQL, (timestamp,))
+            db.execute(INSERT_GAMES_SQL, (timestamp,))
+        finally:
+            db.unregister(SNAPSHOT_BATCH_VIEW)
+
+    def _flush(self, snapshots: Sequence[UniverseSnapshot], timestamp: datetime) -> None:
+        """
+        Write a poll's snapshots and refresh the rollups in one transaction:
+        a single commit per poll, and a failed poll leaves no partial batch behind.
+
+        Runs in a worker thread, so it works on its own cursor rather than the
+        shared connection.
+        """
+        with self.db_manager.db.cursor() as db:
+            db.begin()
+            try:
+                self._write_snapshots(db, snapshots, timestamp)
+                refresh_snapshot_rollups(db, since=timestamp)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
 
     async def poll_top_games(self, universe_ids: Sequence[int]) -> None:
         """Poll CCU data for the specified universe IDs."""
-        unique_ids = list(dict.fromkeys(int(uid) for uid in universe_ids))
+        # Callers may pass arbitrary IDs, and one batch can't write a universe twice
+        unique_ids = list(dict.fromkeys(map(int, universe_ids)))
         if not unique_ids:
             logger.warning("No universe IDs supplied; skipping poll.")
             return
 
-        timestamp = datetime.utcnow()
-        async with aiohttp.ClientSession(timeout=self.http_timeout) as session:
-            semaphore = asyncio.Semaphore(self.max_concurrency)
+        timestamp = _utcnow()
+        session = await self._get_http()
+        batches = [
+            unique_ids[i:i + ROPROXY_UNIVERSE_BATCH_SIZE]
+            for i in range(0, len(unique_ids), ROPROXY_UNIVERSE_BATCH_SIZE)
+        ]
+        queue: asyncio.Queue[tuple[int, List[int]]] = asyncio.Queue()
+        for index, batch in enumerate(batches):
+            queue.put_nowait((index, batch))
+        results: List[List[UniverseSnapshot]] = [[] for _ in batches]
 
-            async def fetch(uid: int) -> UniverseSnapshot:
-                async with semaphore:
-                    return await self._fetch_universe_snapshot(session, uid)
+        # A fixed pool of max_concurrency workers drains the queue, so there is
+        # one task per connection rather than one per batch waiting on a semaphore
+        async def worker() -> None:
+            while True:
+                try:
+                    index, batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[index] = await self._fetch_universe_batch(session, batch)
 
-            snapshots = await asyncio.gather(*(fetch(uid) for uid in unique_ids))
+        async with asyncio.TaskGroup() as group:
+            for _ in range(min(self.max_concurrency, len(batches))):
+                group.create_task(worker())
+        snapshots = [snapshot for batch in results for snapshot in batch]
+        if not snapshots:
+            logger.warning("Every universe batch failed; nothing written this poll.")
+            return
 
-        for snapshot in snapshots:
-            self._upsert_metadata(snapshot)
-            self.db_manager.db.execute(
-                f"DELETE FROM {Tables.GAMES} WHERE universe_id = ? AND timestamp = ?",
-                (snapshot.universe_id, timestamp),
-            )
-            self.db_manager.db.execute(
-                f"INSERT INTO {Tables.GAMES} (universe_id, name, ccu, timestamp) VALUES (?, ?, ?, ?)",
-                (snapshot.universe_id, snapshot.name, snapshot.ccu, timestamp),
-            )
-        self.db_manager.db.commit()
-        logger.info(f"Polled {len(unique_ids)} universes at {timestamp.isoformat()}Z")
+        # Keep the event loop free while DuckDB writes and commits
+        await asyncio.to_thread(self._flush, snapshots, timestamp)
+        logger.info(
+            f"Polled {len(snapshots)} of {len(unique_ids)} universes at {timestamp.isoformat()}Z"
+        )
     
+    async def aclose(self) -> None:
+        """Close the shared HTTP session."""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
     def close(self) -> None:
         """Close database connection."""
         self.db_manager.close()
 
 
+async def _poll_once(client: RoProxyClient, limit: int) -> None:
+    try:
+        universes = await client.get_top_universe_ids(limit=limit)
+        await client.poll_top_games(universes)
+    finally:
+        await client.aclose()
+
+
 if __name__ == "__main__":
-    client = RoProxyClient()
-    universes = asyncio.run(client.get_top_universe_ids(limit=5))
-    asyncio.run(client.poll_top_games(universes))
+    asyncio.run(_poll_once(RoProxyClient(), limit=5))
@@ -5,6 +5,7 @@ schema.py - Centralized database schema management
 import duckdb
 
 from constants import Tables
+from queries import refresh_snapshot_rollups
 
 
 class SchemaManager:
@@ -49,6 +50,24 @@ class SchemaManager:
         db.execute(f"ALTER TABLE {Tables.GAMES} ADD COLUMN IF NOT EXISTS ccu INTEGER")
         db.execute(f"ALTER TABLE {Tables.GAMES} ADD COLUMN IF NOT EXISTS timestamp TIMESTAMP")
         
+        # Per-universe snapshot rollups, kept current by refresh_snapshot_rollups()
+        # (backfilled below once game_metadata exists)
+        db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {Tables.GAMES_LATEST} (
+                universe_id BIGINT PRIMARY KEY,
+                name TEXT,
+                ccu INTEGER,
+                timestamp TIMESTAMP
+            )
+        """)
+        db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {Tables.GAMES_WEEK_AGO} (
+                universe_id BIGINT PRIMARY KEY,
+                ccu INTEGER,
+                timestamp TIMESTAMP
+            )
+        """)
+        
         # Game metadata table
         db.execute(f"""
             CREATE TABLE IF NOT EXISTS {Tables.GAME_METADATA} (
@@ -64,6 +83,10 @@ class SchemaManager:
                 updated_at TIMESTAMP
             )
         """)
+        
+        # Catch the rollups up with snapshots written before they existed or by
+        # older pollers; a no-op beyond the newest batch otherwise
+        refresh_snapshot_rollups(db)
     
     @staticmethod
     def _ensure_studios_table(db: duckdb.DuckDBPyConnection) -> None:
@@ -100,6 +123,13 @@ class SchemaManager:
                 fetched_at TIMESTAMP
             )
         """)
+        
+        # Recent-video lookups filter on published_at; the games PRIMARY KEY
+        # already indexes (universe_id, timestamp)
+        db.execute(f"""
+            CREATE INDEX IF NOT EXISTS youtube_videos_published_at_idx
+            ON {Tables.YOUTUBE_VIDEOS} (published_at)
+        """)
     
     @staticmethod
     def _ensure_mechanic_spikes_table(db: duckdb.DuckDBPyConnection) -> None:
@@ -17,9 +17,9 @@ async def test_early_shift() -> bool:
     print("1) Testing RoProxy connection...")
     client = RoProxyClient()
 
-    snapshot = await client._fetch_universe_snapshot(  # type: ignore[attr-defined]
+    [snapshot] = await client._fetch_universe_batch(  # type: ignore[attr-defined]
         await aiohttp_session(),
-        994732206,
+        [994732206],
     )
     if snapshot.ccu > 0:
         print(f"[OK] RoProxy working! Blox Fruits CCU: {snapshot.ccu:,}")
@@ -9,10 +9,13 @@ import pytest
 from mechanic_detector import (
     MechanicSpike,
     _extract_mechanic,
+    _match_videos_to_games,
     _video_matches_game,
     detect_mechanic_spikes,
     get_historical_spikes,
 )
+from queries import get_growth_candidates, refresh_snapshot_rollups
+from schema import SchemaManager
 
 
 def test_extract_mechanic():
@@ -36,6 +39,25 @@ def test_video_matches_game():
     assert _video_matches_game("Brookhaven", "NEW Brookhaven Update 2025")
 
 
+def test_match_videos_to_games_agrees_with_pairwise():
+    """Batched matcher returns the same pairs as _video_matches_game."""
+    names = ["Pet Simulator X", "Adopt Me", "Blox Fruits", "Tower Defense Simulator"]
+    titles = [
+        "Pet Simulator X New Update!",
+        "Random Gaming Video",
+        "New Adopt Me Secret Code",
+        "tower defense tier list",
+    ]
+    expected = [
+        (i, j)
+        for i, name in enumerate(names)
+        for j, title in enumerate(titles)
+        if _video_matches_game(name, title)
+    ]
+    assert _match_videos_to_games(names, titles) == expected
+    assert _match_videos_to_games([], titles) == []
+
+
 
 @pytest.fixture
 def mock_db():
@@ -68,6 +90,27 @@ def mock_db():
         """
     )
 
+    # Create snapshot rollup tables read by the growth query
+    db.execute(
+        """
+        CREATE TABLE games_latest (
+            universe_id BIGINT PRIMARY KEY,
+            name TEXT,
+            ccu INTEGER,
+            timestamp TIMESTAMP
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TABLE games_7d_ago (
+            universe_id BIGINT PRIMARY KEY,
+            ccu INTEGER,
+            timestamp TIMESTAMP
+        )
+        """
+    )
+
     # Create youtube_videos table
     db.execute(
         """
@@ -108,6 +151,7 @@ def mock_db():
         (now,)
     )
     db.execute("INSERT INTO game_metadata VALUES (123, 'Test Game')")
+    refresh_snapshot_rollups(db)
 
     # Insert mock YouTube video mentioning the game
     db.execute(
@@ -180,6 +224,7 @@ def test_no_spikes_when_no_growth(mock_db):
     db.execute("INSERT INTO games VALUES (456, 'Slow Game', 5100, ?)", (now,))
     db.execute("INSERT INTO games VALUES (456, 'Slow Game', 5000, ? - INTERVAL 7 DAY)", (now,))
     db.execute("INSERT INTO game_metadata VALUES (456, 'Slow Game')")
+    refresh_snapshot_rollups(db)
     
     db.commit()
     db.close()
@@ -194,5 +239,23 @@ def test_no_spikes_when_no_growth(mock_db):
     assert not any(s.universe_id == 456 for s in spikes)
 
 
+def test_growth_candidates_without_rollups(mock_db):
+    """Databases from before the rollups fall back to aggregating games."""
+    db = duckdb.connect(mock_db)
+    db.execute("DROP TABLE games_latest")
+    db.execute("DROP TABLE games_7d_ago")
+    db.close()
+    
+    with duckdb.connect(mock_db, read_only=True) as db:
+        candidates = get_growth_candidates(db, 0.25)
+    assert [(c.universe_id, c.current_ccu, c.week_ago_ccu) for c in candidates] == [(123, 10000, 5000)]
+    
+    # Any writable schema check creates and backfills them
+    with duckdb.connect(mock_db) as db:
+        SchemaManager._ensure_games_tables(db)
+        assert db.execute("SELECT universe_id, ccu FROM games_latest").fetchall() == [(123, 10000)]
+        assert db.execute("SELECT universe_id, ccu FROM games_7d_ago").fetchall() == [(123, 5000)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
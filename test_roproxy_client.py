@@ -0,0 +1,172 @@
+"""Unit tests for RoProxy client discovery and persistence."""
+import asyncio
+import os
+import tempfile
+from datetime import timedelta
+
+import pytest
+from aiohttp import web
+
+import roproxy_client
+from queries import _AGGREGATE_SOURCES
+from roproxy_client import FALLBACK_UNIVERSE_IDS, RoProxyClient, UniverseSnapshot, _utcnow
+
+
+def _snapshot(universe_id: int, ccu: int) -> UniverseSnapshot:
+    return UniverseSnapshot(
+        universe_id=universe_id,
+        name=f"Game {universe_id}",
+        ccu=ccu,
+        root_place_id=None,
+        description=None,
+        creator_id=None,
+        creator_name=None,
+        genre=None,
+        visits=None,
+    )
+
+
+@pytest.fixture
+def client():
+    """RoProxyClient on a fresh on-disk database."""
+    db_dir = tempfile.mkdtemp()
+    client = RoProxyClient(os.path.join(db_dir, "test.duckdb"))
+    yield client
+    client.close()
+
+
+def test_rollups_match_aggregates_after_out_of_order_polls(client):
+    """Late polls on either side of the 7-day line still reach the rollups."""
+    now = _utcnow()
+    polls = [
+        (now - timedelta(days=10), [_snapshot(1, 100), _snapshot(2, 200)]),
+        (now - timedelta(hours=1), [_snapshot(1, 150), _snapshot(3, 300)]),
+        # Older than everything already rolled up, on both sides of the line
+        (now - timedelta(days=3), [_snapshot(1, 999), _snapshot(2, 250), _snapshot(4, 40)]),
+        (now - timedelta(days=8), [_snapshot(1, 110), _snapshot(5, 50)]),
+        (now - timedelta(days=12), [_snapshot(2, 1), _snapshot(6, 60)]),
+    ]
+    for timestamp, snapshots in polls:
+        client._flush(snapshots, timestamp)
+
+    db = client.db_manager.db
+    latest_source, week_ago_source = _AGGREGATE_SOURCES
+    for rollup, source in (("games_latest", latest_source), ("games_7d_ago", week_ago_source)):
+        rolled = db.execute(f"SELECT * FROM {rollup} ORDER BY universe_id").fetchall()
+        expected = db.execute(f"SELECT * FROM {source} ORDER BY universe_id").fetchall()
+        assert rolled == expected
+
+    latest = dict(db.execute("SELECT universe_id, ccu FROM games_latest").fetchall())
+    assert latest == {1: 150, 2: 250, 3: 300, 4: 40, 5: 50, 6: 60}
+    week_ago = dict(db.execute("SELECT universe_id, ccu FROM games_7d_ago").fetchall())
+    assert week_ago == {1: 110, 2: 200, 5: 50, 6: 60}
+
+
+class DiscoveryStub:
+    """Paged discovery endpoint that honours If-None-Match on its first page."""
+
+    def __init__(self) -> None:
+        self.requests = []  # (cursor, limit, If-None-Match) per request
+        self.generation = 0  # bumping it changes every page after the first
+        self.available = True
+
+    async def handle(self, request: web.Request) -> web.Response:
+        cursor = request.query.get("Cursor")
+        limit = int(request.query["Limit"])
+        etag = request.headers.get("If-None-Match")
+        self.requests.append((cursor, limit, etag))
+        if not self.available:
+            return web.Response(status=503)
+        page = int(cursor or 0)
+        if page == 0 and etag == f'"page0-{limit}"':
+            return web.Response(status=304)
+        offset = page * 100 + (1000 * self.generation if page else 0)
+        body = {"data": [{"id": offset + i + 1} for i in range(limit)]}
+        if page < 4:
+            body["nextPageCursor"] = str(page + 1)
+        headers = {"ETag": f'"page0-{limit}"'} if page == 0 else {}
+        return web.json_response(body, headers=headers)
+
+
+def _run_discovery(client, stub, monkeypatch, scenario):
+    """Serve stub on a local port, point discovery at it and run scenario()."""
+    async def run():
+        app = web.Application()
+        app.router.add_get("/discovery", stub.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        port = runner.addresses[0][1]
+        monkeypatch.setattr(
+            roproxy_client, "ROPROXY_DISCOVERY_ENDPOINTS", [f"http://127.0.0.1:{port}/discovery"]
+        )
+        try:
+            return await scenario()
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+
+    # Every call revalidates instead of serving the cache
+    client.cache_ttl = timedelta(seconds=-1)
+    return asyncio.run(run())
+
+
+def _refresh_twice(client, stub, monkeypatch, first_limit, second_limit):
+    async def scenario():
+        first = await client.get_top_universe_ids(first_limit)
+        stub.generation += 1
+        stub.requests.clear()
+        second = await client.get_top_universe_ids(second_limit)
+        return first, second
+
+    return _run_discovery(client, stub, monkeypatch, scenario)
+
+
+def test_discovery_304_reuses_only_first_page(client, monkeypatch):
+    """A 304 stands in for page 1; later pages are fetched fresh from its cursor."""
+    stub = DiscoveryStub()
+    first, second = _refresh_twice(client, stub, monkeypatch, 300, 300)
+
+    assert stub.requests == [(None, 100, '"page0-100"'), ("1", 100, None), ("2", 100, None)]
+    assert second[:100] == first[:100]
+    assert second[100:] == [uid + 1000 for uid in first[100:]]
+
+
+def test_discovery_304_single_page_shortcut(client, monkeypatch):
+    """When one page covers the limit, a 304 needs no further requests."""
+    stub = DiscoveryStub()
+    first, second = _refresh_twice(client, stub, monkeypatch, 50, 50)
+
+    assert stub.requests == [(None, 50, '"page0-50"')]
+    assert second == first == list(range(1, 51))
+
+
+def test_discovery_changed_limit_skips_conditional_get(client, monkeypatch):
+    """Validators for a differently sized first page are not sent."""
+    stub = DiscoveryStub()
+    _, second = _refresh_twice(client, stub, monkeypatch, 50, 300)
+
+    assert stub.requests[0] == (None, 100, None)
+    assert len(second) == 300
+
+
+def test_discovery_fallback_cache_skips_conditional_get(client, monkeypatch):
+    """The fallback list carries no validators, so the next refresh is a plain fetch."""
+    stub = DiscoveryStub()
+
+    async def scenario():
+        stub.available = False
+        fallback = await client.get_top_universe_ids(300)
+        stub.available = True
+        stub.requests.clear()
+        return fallback, await client.get_top_universe_ids(300)
+
+    fallback, fetched = _run_discovery(client, stub, monkeypatch, scenario)
+
+    assert fallback == FALLBACK_UNIVERSE_IDS[:300]
+    assert stub.requests[0] == (None, 100, None)
+    assert fetched == list(range(1, 301))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -5,14 +5,17 @@ metadata in DuckDB for downstream mechanic detection."""
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import logging
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Sequence
 
-import requests
+import aiohttp
+import pyarrow as pa
 
 from config import get_config
 from constants import (
@@ -20,12 +23,14 @@ from constants import (
     DATA_DIR,
     DEFAULT_DB_PATH,
     DEFAULT_YOUTUBE_CHANNELS,
+    YOUTUBE_MAX_CONCURRENCY,
     YOUTUBE_SEARCH_ENDPOINT,
     YOUTUBE_VIDEOS_ENDPOINT,
     Tables,
 )
-from db_manager import get_db_connection
+from db_manager import DatabaseManager
 from exceptions import YouTubeAPIError, ConfigurationError
+from json_utils import loads as json_loads
 from schema import SchemaManager
 
 logger = logging.getLogger(__name__)
@@ -44,8 +49,38 @@ class VideoRecord:
     fetched_at: datetime
 
 
+# Name the batch is registered under while store_records writes it
+VIDEO_BATCH_VIEW = "youtube_video_batch"
+
+VIDEO_BATCH_SCHEMA = pa.schema([
+    ("video_id", pa.string()),
+    ("channel_id", pa.string()),
+    ("channel_title", pa.string()),
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("published_at", pa.timestamp("us", tz="UTC")),
+    ("view_count", pa.int64()),
+    ("like_count", pa.int64()),
+    ("fetched_at", pa.timestamp("us", tz="UTC")),
+])
+
+UPSERT_VIDEOS_SQL = f"""
+    INSERT OR REPLACE INTO {Tables.YOUTUBE_VIDEOS} (
+        video_id, channel_id, channel_title, title,
+        description, published_at, view_count, like_count, fetched_at
+    )
+    SELECT video_id, channel_id, channel_title, title,
+           description, published_at, view_count, like_count, fetched_at
+    FROM {VIDEO_BATCH_VIEW}
+"""
+
+# Kept open for the life of the process; see _get_db
+_DB: DatabaseManager | None = None
+
+
+@lru_cache(maxsize=1)
 def _require_api_key() -> str:
-    """Get YouTube API key from configuration."""
+    """Get YouTube API key from configuration (validated once per process)."""
     config = get_config()
     try:
         config.validate_youtube_api_key()
@@ -82,7 +117,11 @@ def load_channels(path: Path | None = None) -> List[dict]:
     return channels
 
 
-def fetch_recent_video_ids(channel_id: str, max_results: int = 5) -> List[dict]:
+async def fetch_recent_video_ids(
+    session: aiohttp.ClientSession,
+    channel_id: str,
+    max_results: int = 5,
+) -> List[dict]:
     """Return raw search items for the most recent channel uploads."""
     api_key = _require_api_key()
     params = {
@@ -94,16 +133,19 @@ def fetch_recent_video_ids(channel_id: str, max_results: int = 5) -> List[dict]:
         "maxResults": max_results,
     }
     try:
-        response = requests.get(YOUTUBE_SEARCH_ENDPOINT, params=params, timeout=15)
-        response.raise_for_status()
-        payload = response.json()
+        async with session.get(YOUTUBE_SEARCH_ENDPOINT, params=params) as response:
+            response.raise_for_status()
+            payload = json_loads(await response.read())
         return payload.get("items", [])
-    except requests.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         raise YouTubeAPIError(f"Failed to fetch videos for channel {channel_id}",
-                             status_code=getattr(e.response, 'status_code', None)) from e
+                             status_code=getattr(e, 'status', None)) from e
 
 
-def fetch_video_statistics(video_ids: Iterable[str]) -> dict[str, dict]:
+async def fetch_video_statistics(
+    session: aiohttp.ClientSession,
+    video_ids: Iterable[str],
+) -> dict[str, dict]:
     """Fetch statistics for the provided video IDs."""
     video_ids = [vid for vid in video_ids if vid]
     if not video_ids:
@@ -117,26 +159,31 @@ def fetch_video_statistics(video_ids: Iterable[str]) -> dict[str, dict]:
         "maxResults": len(video_ids),
     }
     try:
-        response = requests.get(YOUTUBE_VIDEOS_ENDPOINT, params=params, timeout=15)
-        response.raise_for_status()
-        payload = response.json()
+        async with session.get(YOUTUBE_VIDEOS_ENDPOINT, params=params) as response:
+            response.raise_for_status()
+            payload = json_loads(await response.read())
         result: dict[str, dict] = {}
         for item in payload.get("items", []):
             result[item["id"]] = item
         return result
-    except requests.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         raise YouTubeAPIError(f"Failed to fetch video statistics",
-                             status_code=getattr(e.response, 'status_code', None)) from e
+                             status_code=getattr(e, 'status', None)) from e
 
 
-def collect_creator_videos(channel_id: str, max_results: int = 5) -> List[VideoRecord]:
+async def collect_creator_videos(
+    session: aiohttp.ClientSession,
+    channel_id: str,
+    max_results: int = 5,
+    fetched_at: datetime | None = None,
+) -> List[VideoRecord]:
     """Fetch and normalize the most recent videos for a channel."""
 
-    search_items = fetch_recent_video_ids(channel_id, max_results=max_results)
+    search_items = await fetch_recent_video_ids(session, channel_id, max_results=max_results)
     video_ids = [item.get("id", {}).get("videoId") for item in search_items if item.get("id")]
-    stats_map = fetch_video_statistics(video_ids)
+    stats_map = await fetch_video_statistics(session, video_ids)
     records: List[VideoRecord] = []
-    fetched_at = datetime.now(timezone.utc)
+    fetched_at = fetched_at or datetime.now(timezone.utc)
 
     for item in search_items:
         video_id = item.get("id", {}).get("videoId")
@@ -146,7 +193,8 @@ def collect_creator_videos(channel_id: str, max_results: int = 5) -> List[VideoR
         stats = stats_map.get(video_id, {})
         published_at_str = snippet.get("publishedAt")
         try:
-            published_at = datetime.fromisoformat(published_at_str.replace("Z", "+00:00"))
+            # Python 3.11+ parses the API's trailing "Z" directly
+            published_at = datetime.fromisoformat(published_at_str)
         except Exception:
             published_at = fetched_at
 
@@ -167,37 +215,39 @@ def collect_creator_videos(channel_id: str, max_results: int = 5) -> List[VideoR
     return records
 
 
+def _get_db(db_path: str) -> DatabaseManager:
+    """Process-wide connection; the YouTube table is ensured once per database."""
+    global _DB
+    if _DB is None or _DB.db_path != db_path:
+        if _DB is not None:
+            # Release the previous file's lock before switching databases
+            _DB.close()
+        _DB = DatabaseManager(db_path)
+        SchemaManager._ensure_youtube_table(_DB.db)
+    return _DB
+
+
 def store_records(records: Iterable[VideoRecord], db_path: str = DEFAULT_DB_PATH) -> int:
     """Store video records to the database."""
     records = list(records)
     if not records:
         return 0
     
-    with get_db_connection(db_path) as db:
-        SchemaManager._ensure_youtube_table(db)
-        db.executemany(
-            f"""
-            INSERT OR REPLACE INTO {Tables.YOUTUBE_VIDEOS} (
-                video_id, channel_id, channel_title, title,
-                description, published_at, view_count, like_count, fetched_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            [
-                (
-                    r.video_id,
-                    r.channel_id,
-                    r.channel_title,
-                    r.title,
-                    r.description,
-                    r.published_at,
-                    r.view_count,
-                    r.like_count,
-                    r.fetched_at,
-                )
-                for r in records
-            ],
-        )
-        db.commit()
+    # One row per video_id (last wins): a single INSERT OR REPLACE can't
+    # touch the same key twice
+    latest = {record.video_id: record for record in records}
+    batch = pa.Table.from_pylist(
+        [asdict(record) for record in latest.values()],
+        schema=VIDEO_BATCH_SCHEMA,
+    )
+    
+    db = _get_db(db_path).db
+    db.register(VIDEO_BATCH_VIEW, batch)
+    try:
+        db.execute(UPSERT_VIDEOS_SQL)
+    finally:
+        db.unregister(VIDEO_BATCH_VIEW)
+    db.commit()
     return len(records)
 
 
@@ -213,6 +263,49 @@ def select_channel_batch(
     return batches[batch_index]
 
 
+async def _collect_channel(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    channel: dict,
+    max_results: int,
+    fetched_at: datetime,
+) -> List[VideoRecord]:
+    """Collect one channel, logging failures instead of raising."""
+    channel_id = channel["id"]
+    channel_name = channel.get("name", channel_id)
+    async with semaphore:
+        try:
+            records = await collect_creator_videos(
+                session, channel_id, max_results=max_results, fetched_at=fetched_at
+            )
+        except YouTubeAPIError as exc:
+            logger.error(f"YouTube API error for {channel_name} ({channel_id}): {exc}")
+            return []
+        except Exception as exc:
+            logger.warning(f"Failed to collect {channel_name} ({channel_id}): {exc}")
+            return []
+    logger.info(f"Fetched {len(records)} videos for {channel_name} ({channel_id})")
+    return records
+
+
+async def collect_channels(channels: Sequence[dict], max_results: int = 5) -> List[VideoRecord]:
+    """Fetch recent videos for every channel concurrently."""
+    semaphore = asyncio.Semaphore(YOUTUBE_MAX_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=15)
+    fetched_at = datetime.now(timezone.utc)
+    # A pool no larger than the semaphore keeps every request on an already
+    # open keep-alive connection after the first YOUTUBE_MAX_CONCURRENCY
+    connector = aiohttp.TCPConnector(limit=YOUTUBE_MAX_CONCURRENCY, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        results = await asyncio.gather(
+            *(
+                _collect_channel(session, semaphore, channel, max_results, fetched_at)
+                for channel in channels
+            )
+        )
+    return [record for records in results for record in records]
+
+
 def run_collection(
     channels: Sequence[dict],
     max_results: int = 5,
@@ -221,19 +314,8 @@ def run_collection(
 ) -> None:
     """Run video collection for the specified channels."""
     selected = select_channel_batch(channels, batch_size, batch_index)
-    total = 0
-    for channel in selected:
-        channel_id = channel["id"]
-        channel_name = channel.get("name", channel_id)
-        try:
-            records = collect_creator_videos(channel_id, max_results=max_results)
-            inserted = store_records(records)
-            logger.info(f"Stored {inserted} videos for {channel_name} ({channel_id})")
-            total += inserted
-        except YouTubeAPIError as exc:
-            logger.error(f"YouTube API error for {channel_name} ({channel_id}): {exc}")
-        except Exception as exc:
-            logger.warning(f"Failed to collect {channel_name} ({channel_id}): {exc}")
+    records = asyncio.run(collect_channels(selected, max_results=max_results))
+    total = store_records(records)
     logger.info(f"Stored/updated {total} videos from {len(selected)} channels")
 
 